@@ -5,59 +5,231 @@ This script provides two implementations:
 1. MoviePy-based (Pythonic, easy to use)
 2. FFmpeg-based (faster, more efficient for large videos)
 
+Chunks are written into a hidden .part directory and moved into the output
+directory only once complete, so an uploader or player watching the output
+directory (inotify, ReadDirectoryChangesW) never picks up a partial file.
+
 Requirements:
 - moviepy (for MoviePy implementation)
 - ffmpeg (for FFmpeg implementation - binary should be in PATH or in ffmpeg/ folder)
 
 Usage:
-    python app.py <input_video> [--method moviepy|ffmpeg] [--output-dir <dir>] [--duration <seconds>]
+    python app.py <input_video> [--method moviepy|ffmpeg] [--output-dir <dir>] [--duration <seconds>] [--reencode] [--codec <encoder>] [--prealloc]
+    python app.py --batch "<glob>" [--output-dir <dir>] [--duration <seconds>]
+    python app.py <input_video> --reencode --hosts <host1,host2,...> [--codec <encoder>]
 """
 
 import os
 import sys
 import argparse
-import subprocess
+import glob
 import math
+import shlex
+import shutil
+import subprocess
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from itertools import accumulate
 from pathlib import Path
 
+@lru_cache(maxsize=1)
+def _ffmpeg_bin():
+    """Resolve the FFmpeg binary to an absolute path once, preferring the system installation.
+
+    Spawning an absolute path skips the PATH search on every subprocess call.
+    """
+    if os.path.exists("C:\\ffmpeg\\ffmpeg.exe"):
+        return "C:\\ffmpeg\\ffmpeg.exe"
+    return shutil.which("ffmpeg") or "ffmpeg"
+
+@lru_cache(maxsize=1)
+def _ffprobe_bin():
+    """Resolve the FFprobe binary to an absolute path once, preferring the system installation."""
+    if os.path.exists("C:\\ffmpeg\\ffprobe.exe"):
+        return "C:\\ffmpeg\\ffprobe.exe"
+    return shutil.which("ffprobe") or "ffprobe"
+
+@lru_cache(maxsize=1)
+def _moviepy_ffmpeg_bin():
+    """Resolve the FFmpeg binary MoviePy is configured with (usually imageio-ffmpeg's).
+
+    The MoviePy method is picked when no system FFmpeg is found, so it must
+    not depend on _ffmpeg_bin().
+    """
+    from moviepy.config import get_setting
+    return get_setting("FFMPEG_BINARY")
+
+@lru_cache(maxsize=1)
+def _moviepy_ffprobe_bin():
+    """Resolve an FFprobe to go with MoviePy's FFmpeg.
+
+    imageio-ffmpeg ships no FFprobe, so this looks next to MoviePy's FFmpeg
+    first and falls back to the system one.
+    """
+    ffmpeg_binary = _moviepy_ffmpeg_bin()
+    name = "ffprobe.exe" if ffmpeg_binary.lower().endswith(".exe") else "ffprobe"
+    candidate = os.path.join(os.path.dirname(ffmpeg_binary), name)
+    if os.path.dirname(ffmpeg_binary) and os.path.exists(candidate):
+        return candidate
+    return _ffprobe_bin()
+
+# Hardware H.264 encoders, in order of preference
+_HW_ENCODERS = ("h264_nvenc", "h264_qsv", "h264_videotoolbox", "h264_amf")
+
+@lru_cache(maxsize=2)
+def _hw_encoder(ffmpeg_binary):
+    """Return the first hardware H.264 encoder ffmpeg_binary can use, or None."""
+    try:
+        result = subprocess.run([ffmpeg_binary, "-hide_banner", "-encoders"],
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    except OSError:
+        return None
+    
+    listed = {fields[1] for fields in map(str.split, result.stdout.splitlines()) if len(fields) > 1}
+    for codec in _HW_ENCODERS:
+        if codec not in listed:
+            continue
+        # Being compiled in does not mean the hardware is present, so try it
+        probe = subprocess.run(
+            [
+                ffmpeg_binary,
+                "-loglevel", "error",
+                "-f", "lavfi",
+                "-i", "color=size=256x256:duration=0.1",
+                "-c:v", codec,
+                "-f", "null",
+                "-"
+            ],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL
+        )
+        if probe.returncode == 0:
+            return codec
+    return None
+
+_hw_encoder_lock = threading.Lock()
+
+def _resolve_codec(codec):
+    """Turn a --codec value into an encoder name.
+
+    Hardware encoders are only probed for "auto", and only once something
+    actually needs encoding.
+    """
+    if codec != "auto":
+        return codec
+    # Fallback re-encodes run on worker threads; probe only once
+    with _hw_encoder_lock:
+        return _hw_encoder(_moviepy_ffmpeg_bin()) or "libx264"
+
+def _encoder_args(codec):
+    """Return FFmpeg output arguments that favour encoding speed for codec."""
+    if codec == "libx264":
+        return ["-preset", "ultrafast", "-crf", "23"]
+    return []
+
+def _write_options(codec):
+    """Return write_videofile keyword arguments matching _encoder_args(codec).
+
+    MoviePy always passes its own -preset, so the preset goes through its
+    preset argument rather than ffmpeg_params.
+    """
+    if codec == "libx264":
+        return {'preset': 'ultrafast', 'ffmpeg_params': ['-crf', '23']}
+    return {}
+
+def _progress(iterable, total, unit="chunk"):
+    """Yield from iterable while showing progress on a single line.
+
+    Uses tqdm when installed, otherwise rewrites the line at most twice a
+    second so reporting never slows the loop down. total may be None when
+    it is not known up front.
+    """
+    try:
+        from tqdm import tqdm
+    except ImportError:
+        tqdm = None
+    
+    if tqdm is not None:
+        yield from tqdm(iterable, total=total, unit=unit)
+        return
+    
+    def show(done):
+        count = done if total is None else f"{done}/{total}"
+        sys.stdout.write(f"\rProcessed {count} {unit}s")
+        sys.stdout.flush()
+    
+    done = 0
+    shown = 0
+    last_print = 0.0
+    for item in iterable:
+        yield item
+        done += 1
+        now = time.monotonic()
+        if done == total or now - last_print > 0.5:
+            show(done)
+            shown = done
+            last_print = now
+    if shown != done:
+        show(done)
+    sys.stdout.write("\n")
+
+def _staging_path(output_file):
+    """Return where output_file is written before being moved into place.
+
+    The staging directory sits next to the output, so the final os.replace
+    is an atomic rename on the same volume.
+    """
+    staging_dir = os.path.join(os.path.dirname(output_file), ".part")
+    os.makedirs(staging_dir, exist_ok=True)
+    return os.path.join(staging_dir, os.path.basename(output_file))
+
+def _remove_staging_dir(output_dir):
+    """Remove the staging directory if nothing was left behind in it."""
+    try:
+        os.rmdir(os.path.join(output_dir, ".part"))
+    except OSError:
+        pass
+
 def get_video_duration_ffmpeg(video_path):
     """Get video duration using FFmpeg."""
     try:
-        # Use system FFmpeg installation
-        ffmpeg_path = "C:\\ffmpeg\\ffprobe.exe" if os.path.exists("C:\\ffmpeg\\ffprobe.exe") else "ffprobe"
-        
         cmd = [
-            ffmpeg_path,
+            _ffprobe_bin(),
             "-v", "quiet",
+            # The container duration is in the header (moov atom, MKV Info),
+            # so barely probe the streams themselves (0 would mean the 5s
+            # default, hence 1 microsecond)
+            "-probesize", "32K",
+            "-analyzeduration", "1",
             "-show_entries", "format=duration",
             "-of", "csv=p=0",
             video_path
         ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True)
+        # -v quiet leaves nothing on stderr worth buffering
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
         if result.returncode == 0:
             return float(result.stdout.strip())
         else:
-            raise Exception(f"FFprobe error: {result.stderr}")
+            raise Exception(f"FFprobe exited with code {result.returncode}")
     except Exception as e:
         print(f"Error getting video duration with FFmpeg: {e}")
         return None
 
-def split_video_ffmpeg(input_path, output_dir, chunk_duration=60):
-    """Split video using FFmpeg (faster method)."""
-    print("Using FFmpeg method...")
-    
-    # Get video duration
-    duration = get_video_duration_ffmpeg(input_path)
-    if duration is None:
-        print("Failed to get video duration. Please check if FFmpeg is installed.")
-        return False
-    
-    print(f"Video duration: {duration:.2f} seconds")
-    
-    # Calculate number of chunks
-    num_chunks = math.ceil(duration / chunk_duration)
-    print(f"Will create {num_chunks} chunks of {chunk_duration} seconds each")
+def split_video_ffmpeg(input_path, output_dir, chunk_duration=60, quiet=False, duration=None):
+    """Split video using FFmpeg (faster method).
+
+    Runs a single FFmpeg process with the segment muxer, so the input is
+    read once and every chunk is written sequentially. Returns the paths of
+    the chunks written; on failure none are kept and it returns []. quiet
+    leaves only error messages; duration, when known, gives the progress
+    line its expected total.
+    """
+    if not quiet:
+        print("Using FFmpeg method...")
     
     # Create output directory
     os.makedirs(output_dir, exist_ok=True)
@@ -66,41 +238,625 @@ def split_video_ffmpeg(input_path, output_dir, chunk_duration=60):
     input_path_obj = Path(input_path)
     extension = input_path_obj.suffix
     
-    # Try to use system FFmpeg installation
-    ffmpeg_path = "C:\\ffmpeg\\ffmpeg.exe" if os.path.exists("C:\\ffmpeg\\ffmpeg.exe") else "ffmpeg"
+    staging_dir = os.path.dirname(_staging_path(os.path.join(output_dir, "chunk")))
+    
+    cmd = [
+        _ffmpeg_bin(),
+        "-loglevel", "error",  # Only errors, no per-frame progress
+        "-nostats",
+        "-i", input_path,
+        "-c", "copy",  # Copy streams without re-encoding (faster)
+        "-map", "0",
+        "-f", "segment",
+        "-segment_time", str(chunk_duration),
+        "-reset_timestamps", "1",  # Each chunk starts at zero
+        "-segment_start_number", "1",
+        # Name each chunk on stdout as soon as it is complete
+        "-segment_list", "pipe:1",
+        "-segment_list_type", "flat",
+        os.path.join(staging_dir, f"chunk_%d{extension}"),
+        "-y"  # Overwrite output files
+    ]
+    
+    if not quiet:
+        print(f"Splitting into chunks of {chunk_duration} seconds each")
+    
+    chunks = []
+    
+    def publish(name):
+        chunks.append(os.path.join(output_dir, name))
+        os.replace(os.path.join(staging_dir, name), chunks[-1])
+    
+    def discard():
+        # A failed run returns no chunks, so leave none of them behind
+        names = [pending] if pending else []
+        paths = chunks + [os.path.join(staging_dir, name) for name in names]
+        for path in paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        _remove_staging_dir(output_dir)
+    
+    process = None
+    pending = None
+    stderr_lines = []
+    try:
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        # Drain stderr alongside stdout so an error flood cannot fill the pipe
+        stderr_reader = threading.Thread(target=lambda: stderr_lines.extend(process.stderr), daemon=True)
+        stderr_reader.start()
+        
+        def listed():
+            for line in process.stdout:
+                name = line.strip()
+                if name:
+                    yield name
+        
+        names = listed()
+        if not quiet:
+            # Keyframe placement can shift the cuts, so this is an estimate
+            total = -(-int(duration * 1000) // (chunk_duration * 1000)) if duration else None
+            names = _progress(names, total)
+        
+        # The segmenter lists a chunk just before closing it, so a chunk is
+        # only published once the next one is listed (or FFmpeg has exited)
+        for name in names:
+            if pending:
+                publish(pending)
+            pending = name
+        process.wait()
+        stderr_reader.join()
+        if process.returncode == 0 and pending:
+            publish(pending)
+    except Exception as e:
+        if process is not None:
+            process.kill()
+            process.wait()
+        discard()
+        print(f"Error running FFmpeg: {e}")
+        return []
+    
+    if process.returncode != 0:
+        discard()
+        print(f"Error splitting video: {''.join(stderr_lines)}")
+        return []
+    
+    _remove_staging_dir(output_dir)
+    if not quiet:
+        print(f"\nCompleted! Created {len(chunks)} chunks in '{output_dir}'")
+    return chunks
+
+class _HostUnreachable(Exception):
+    """Raised when SSH cannot connect to a host at all."""
+
+class _HostPool:
+    """Run commands on chunk files on remote hosts over SSH.
+
+    Each host has a worker thread with one chunk in flight, taking the
+    next pending chunk as soon as it is free. A failed chunk goes back to
+    the pending list for a host that has not tried it yet, up to
+    max_attempts hosts, and a host that cannot be reached stops taking
+    chunks.
+    """
+    
+    def __init__(self, hosts, max_attempts=3):
+        self._max_attempts = max_attempts
+        self._live = set(hosts)
+        # (future, chunk_path, remote_cmd, hosts tried so far)
+        self._pending = []
+        self._closed = False
+        self._cond = threading.Condition()
+        self._threads = [
+            threading.Thread(target=self._work, args=(host,), daemon=True)
+            for host in hosts
+        ]
+        for thread in self._threads:
+            thread.start()
+    
+    def submit(self, chunk_path, remote_cmd):
+        """Queue remote_cmd for chunk_path on the next free host, returning a Future.
+
+        remote_cmd is an argument list in which "{src}" and "{dst}" stand
+        for the remote input and output paths; the chunk is replaced by the
+        remote output once the command succeeds.
+        """
+        future = Future()
+        self._requeue((future, chunk_path, remote_cmd, frozenset()), None)
+        return future
+    
+    def shutdown(self):
+        """Let every host finish its queued chunks and stop the workers."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join()
+    
+    def _requeue(self, job, error):
+        tried = job[3]
+        with self._cond:
+            if len(tried) < self._max_attempts and self._live - tried:
+                self._pending.append(job)
+                self._cond.notify_all()
+                return
+        job[0].set_exception(error or Exception("no reachable hosts left"))
+    
+    def _take(self, host):
+        with self._cond:
+            while True:
+                for job in self._pending:
+                    if host not in job[3]:
+                        self._pending.remove(job)
+                        return job
+                if self._closed:
+                    self._live.discard(host)
+                    return None
+                self._cond.wait()
+    
+    def _drop_host(self, host, error):
+        # Fail the chunks that no remaining host could still take
+        with self._cond:
+            self._live.discard(host)
+            stranded = [job for job in self._pending if not self._live - job[3]]
+            for job in stranded:
+                self._pending.remove(job)
+        for job in stranded:
+            job[0].set_exception(error)
+    
+    def _work(self, host):
+        while True:
+            job = self._take(host)
+            if job is None:
+                return
+            future, chunk_path, remote_cmd, tried = job
+            if not tried and not future.set_running_or_notify_cancel():
+                continue
+            job = (future, chunk_path, remote_cmd, tried | {host})
+            try:
+                self._run(host, chunk_path, remote_cmd)
+            except _HostUnreachable as e:
+                self._drop_host(host, e)
+                self._requeue(job, e)
+                return
+            except Exception as e:
+                self._requeue(job, e)
+                continue
+            future.set_result(chunk_path)
+    
+    @staticmethod
+    def _run(host, chunk_path, remote_cmd):
+        # Let the host pick a unique directory, so runs from different
+        # machines or processes never share remote files
+        result = subprocess.run(
+            ["ssh", host, "mktemp -d /tmp/split_movie-XXXXXX"],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+        )
+        if result.returncode == 255:
+            raise _HostUnreachable(f"ssh to {host} failed: {result.stderr.strip()}")
+        if result.returncode != 0:
+            raise Exception(f"ssh to {host} failed: {result.stderr.strip()}")
+        remote_dir = result.stdout.strip()
+        
+        name = os.path.basename(chunk_path)
+        remote_src = f"{remote_dir}/src-{name}"
+        remote_dst = f"{remote_dir}/{name}"
+        staging_file = _staging_path(chunk_path)
+        
+        steps = [
+            ["scp", "-q", chunk_path, f"{host}:{remote_src}"],
+            ["ssh", host, shlex.join(
+                {"{src}": remote_src, "{dst}": remote_dst}.get(arg, arg) for arg in remote_cmd
+            )],
+            ["scp", "-q", f"{host}:{remote_dst}", staging_file]
+        ]
+        try:
+            for step in steps:
+                result = subprocess.run(step, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+                if step[0] == "ssh" and result.returncode == 255:
+                    raise _HostUnreachable(f"ssh to {host} failed: {result.stderr.strip()}")
+                if result.returncode != 0:
+                    raise Exception(f"{step[0]} to {host} failed: {result.stderr.strip()}")
+        finally:
+            subprocess.run(
+                ["ssh", host, f"rm -rf {shlex.quote(remote_dir)}"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL
+            )
+        os.replace(staging_file, chunk_path)
+
+def _distribute(chunks, hosts, codec="libx264"):
+    """Re-encode chunks in place on remote hosts, returning the success count."""
+    remote_cmd = [
+        "ffmpeg",
+        "-loglevel", "error",
+        "-nostats",
+        "-i", "{src}",
+        "-map", "0",
+        "-c:v", codec,
+        *_encoder_args(codec),
+        "-c:a", "aac",
+        # -map 0 also keeps subtitle and data streams, which need a codec too
+        "-c:s", "copy",
+        "-c:d", "copy",
+        "{dst}",
+        "-y"
+    ]
+    
+    print(f"Re-encoding {len(chunks)} chunks on {len(hosts)} hosts...")
     
-    # Split the video
     success_count = 0
+    errors = []
+    pool = _HostPool(hosts)
+    try:
+        futures = {pool.submit(chunk, remote_cmd): chunk for chunk in chunks}
+        for future in _progress(as_completed(futures), len(chunks)):
+            try:
+                future.result()
+                success_count += 1
+            except Exception as e:
+                errors.append((futures[future], e))
+    finally:
+        pool.shutdown()
+    
+    if chunks:
+        _remove_staging_dir(os.path.dirname(chunks[0]))
+    for chunk, error in sorted(errors):
+        print(f"Error re-encoding {chunk}: {error}")
+    return success_count
+
+def split_batch_ffmpeg(pattern, output_dir, chunk_duration=60):
+    """Split every video matching a glob pattern with FFmpeg, several at once.
+
+    Each video's chunks go to a subdirectory of output_dir named after its
+    path relative to the matched files' common directory, so a/clip.mp4 and
+    b/clip.mp4 do not collide.
+    """
+    files = sorted(glob.glob(pattern, recursive=True))
+    if not files:
+        print(f"No files match '{pattern}'")
+        return False
+    
+    try:
+        root = os.path.commonpath([os.path.dirname(os.path.abspath(path)) for path in files])
+    except ValueError:
+        # Windows paths on different drives share no directory
+        print(f"Error: files matching '{pattern}' are on different drives; run one batch per drive")
+        return False
+    targets = {}
+    for path in files:
+        relative = os.path.relpath(os.path.abspath(path), root)
+        targets.setdefault(os.path.splitext(relative)[0], []).append(path)
+    
+    # clip.mp4 and clip.mkv would still share a directory
+    clashes = [paths for paths in targets.values() if len(paths) > 1]
+    if clashes:
+        print("Error: these files would be split into the same directory:")
+        for paths in clashes:
+            print(f"  - {', '.join(paths)}")
+        return False
+    
+    print(f"Splitting {len(files)} files...")
+    
+    # Half the cores, since each FFmpeg may use several threads to demux
+    max_workers = max(1, (os.cpu_count() or 2) // 2)
+    failed = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                split_video_ffmpeg, paths[0], os.path.join(output_dir, target), chunk_duration,
+                quiet=True
+            ): paths[0]
+            for target, paths in targets.items()
+        }
+        for future in _progress(as_completed(futures), len(files), unit="file"):
+            if not future.result():
+                failed.append(futures[future])
+    
+    if failed:
+        print(f"\nFailed to split {len(failed)}/{len(files)} files:")
+        for path in failed:
+            print(f"  - {path}")
+    return not failed
+
+def _video_packets(input_path, ffprobe_binary=None):
+    """Return (pts_time, size, is_keyframe) for every packet of the first video stream.
+
+    Timestamps are relative to the file's start_time, as input -ss is, so
+    MPEG-TS style inputs that start at ~1.4s cut in the right place.
+    Packets are sorted by timestamp. Only the packet index is read, so
+    nothing is decoded. Returns an empty list when FFprobe is unavailable
+    or fails.
+    """
+    cmd = [
+        ffprobe_binary or _ffprobe_bin(),
+        "-v", "quiet",
+        "-select_streams", "v:0",
+        "-show_entries", "packet=pts_time,size,flags:format=start_time",
+        # One short line per packet, read as it comes, instead of one JSON
+        # document holding the whole index (~430k packets for 2h at 60fps)
+        "-print_format", "csv",
+        input_path
+    ]
+    
+    packets = []
+    start_time = 0.0
+    try:
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True) as process:
+            # Lines are "packet,<pts_time>,<size>,<flags>" and, at the end,
+            # "format,<start_time>"
+            for line in process.stdout:
+                fields = line.rstrip("\n").split(",")
+                if fields[0] == "packet" and len(fields) == 4 and fields[1] != "N/A":
+                    packets.append((
+                        float(fields[1]),
+                        int(fields[2]) if fields[2].isdigit() else 0,
+                        "K" in fields[3]
+                    ))
+                elif fields[0] == "format" and len(fields) == 2 and fields[1] != "N/A":
+                    start_time = float(fields[1])
+        if process.returncode != 0:
+            return []
+    except (OSError, ValueError):
+        return []
+    
+    # FFprobe prints microseconds; rounding drops float noise
+    return sorted(
+        (round(pts - start_time, 6), size, is_keyframe)
+        for pts, size, is_keyframe in packets
+    )
+
+def _chunk_bounds(duration, chunk_duration, keyframes):
+    """Return (start, end) pairs for every chunk, with end None for the last.
+
+    Each chunk starts on the last keyframe at or before its nominal start,
+    so every chunk can be stream copied without overlapping its neighbours.
+    """
+    num_chunks = -(-int(duration * 1000) // (chunk_duration * 1000))
+    starts = []
     for i in range(num_chunks):
+        target = i * chunk_duration
+        k = bisect_right(keyframes, target) - 1
+        start = keyframes[k] if i > 0 and k >= 0 else target
+        # Keyframes further apart than a chunk would give empty chunks
+        if not starts or start > starts[-1]:
+            starts.append(start)
+    return list(zip(starts, starts[1:] + [None]))
+
+def _chunk_sizes(packets, bounds):
+    """Estimate the bytes each chunk will take from its video packets.
+
+    The estimate is kept below the video payload: the real file also holds
+    audio and container data, so FFmpeg always writes past it.
+    """
+    timestamps = [pts for pts, _, _ in packets]
+    totals = list(accumulate((size for _, size, _ in packets), initial=0))
+    sizes = []
+    for start, end in bounds:
+        lo = bisect_left(timestamps, start)
+        hi = len(timestamps) if end is None else bisect_left(timestamps, end)
+        sizes.append((totals[hi] - totals[lo]) * 9 // 10)
+    return sizes
+
+@lru_cache(maxsize=1)
+def _fallocate():
+    """Return libc's fallocate64, or None where it is not available."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        import ctypes
+        fallocate = ctypes.CDLL(None, use_errno=True).fallocate64
+    except (OSError, AttributeError):
+        return None
+    fallocate.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_int64, ctypes.c_int64]
+    return fallocate
+
+def _preallocate(path, size):
+    """Reserve size bytes for path up front, returning whether it worked.
+
+    Lets the filesystem hand out contiguous extents instead of growing the
+    file piecemeal (Linux only). The file itself stays empty, so its size
+    is whatever is written afterwards and an overestimate leaves no padding.
+    """
+    fallocate = _fallocate()
+    if size <= 0 or fallocate is None:
+        return False
+    
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC)
+    try:
+        # os.posix_fallocate would extend the file; FALLOC_FL_KEEP_SIZE
+        # (1) only reserves the blocks
+        return fallocate(fd, 1, 0, size) == 0
+    finally:
+        os.close(fd)
+
+def _write_chunk_moviepy(i, input_path, start_time, end_time, output_file, codec="libx264",
+                         reserve=0):
+    """Write one chunk with MoviePy, returning (i, ok, messages).
+
+    end_time None means up to the end of the video, and reserve is the
+    number of bytes to preallocate for the output. The chunk is stream
+    copied first; only if that fails is it re-encoded, with its own
+    VideoFileClip because MoviePy readers keep a seek position and cannot
+    be shared between threads. messages lists what went wrong along the
+    way, for the caller to print once the progress line is done.
+    """
+    from moviepy.editor import VideoFileClip
+    
+    staging_file = _staging_path(output_file)
+    messages = []
+    
+    # Copy streams without re-encoding (much faster). Seeking before -i
+    # jumps straight to the keyframe; the 1ms nudges keep the rounding in
+    # FFprobe's printed timestamps from landing on the neighbouring keyframe.
+    cmd = [
+        _moviepy_ffmpeg_bin(),
+        "-loglevel", "error",
+        "-nostats",
+        "-ss", f"{start_time + 0.001:.6f}",
+        "-i", input_path
+    ]
+    if end_time is not None:
+        cmd += ["-t", f"{end_time - start_time - 0.002:.6f}"]
+    # Input seeking already starts the chunk's timestamps at zero
+    cmd += [
+        "-map", "0",
+        "-c", "copy"
+    ]
+    preallocated = _preallocate(staging_file, reserve)
+    if preallocated:
+        # Write into the reserved space instead of truncating it away
+        cmd += ["-truncate", "0"]
+    cmd += [staging_file, "-y"]
+    
+    try:
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+        if result.returncode == 0:
+            if preallocated:
+                # Give back reserved blocks past the end of what was written
+                os.truncate(staging_file, os.path.getsize(staging_file))
+            os.replace(staging_file, output_file)
+            return i, True, messages
+        messages.append(f"Stream copy failed for chunk {i+1}, re-encoding: {result.stderr.strip()}")
+    except OSError as e:
+        messages.append(f"Stream copy failed for chunk {i+1}, re-encoding: {e}")
+    
+    try:
+        video = VideoFileClip(input_path)
+    except Exception as e:
+        messages.append(f"Error creating chunk {i+1}: Error loading video: {e}")
+        return i, False, messages
+    
+    # Full settings first, then without the audio codec for problematic
+    # files, then MoviePy's defaults
+    codec = _resolve_codec(codec)
+    retry_configs = [
+        {'codec': codec, 'audio_codec': 'aac', **_write_options(codec)},
+        {'codec': codec, **_write_options(codec)},
+        {},
+    ]
+    
+    error = None
+    try:
+        # Create the subclip once; only the write is retried
+        subclip = video.subclip(start_time, end_time)
+        for attempt, config in enumerate(retry_configs):
+            if attempt:
+                messages.append(f"Retrying chunk {i+1} ({attempt}/{len(retry_configs) - 1}): {error}")
+            try:
+                subclip.write_videofile(staging_file, logger=None, **config)
+                os.replace(staging_file, output_file)
+                return i, True, messages
+            except Exception as e:
+                error = e
+        messages.append(f"Error creating chunk {i+1}: All retries failed: {error}")
+        return i, False, messages
+    except Exception as e:
+        messages.append(f"Error creating chunk {i+1}: Error creating subclip: {e}")
+        return i, False, messages
+    finally:
+        video.close()
+
+def _reencode_chunks(video, input_path, output_files, chunk_duration, codec="libx264"):
+    """Re-encode every chunk from one decoding pass, returning the success count.
+
+    Frames come from a single pass over the already open VideoFileClip and
+    are piped straight into the encoder of the chunk they fall in, so the
+    input is decoded once and a chunk keeps encoding while the next one is
+    fed.
+    """
+    width, height = video.size
+    fps = video.fps
+    num_chunks = len(output_files)
+    codec = _resolve_codec(codec)
+    
+    def start_encoder(i):
         start_time = i * chunk_duration
-        output_file = os.path.join(output_dir, f"chunk_{i+1}{extension}")
-        
         cmd = [
-            ffmpeg_path,
-            "-i", input_path,
+            _moviepy_ffmpeg_bin(),
+            "-loglevel", "error",
+            "-nostats",
+            "-f", "rawvideo",
+            "-pix_fmt", "rgb24",
+            "-s", f"{width}x{height}",
+            "-r", str(fps),
+            "-i", "-",
+            # Audio is taken from the source for the same time range
             "-ss", str(start_time),
             "-t", str(chunk_duration),
-            "-c", "copy",  # Copy streams without re-encoding (faster)
-            "-avoid_negative_ts", "make_zero",
-            output_file,
-            "-y"  # Overwrite output files
+            "-i", input_path,
+            "-map", "0:v",
+            "-map", "1:a?",
+            "-c:v", codec,
+            *_encoder_args(codec),
+            "-pix_fmt", "yuv420p",
+            "-c:a", "aac",
+            _staging_path(output_files[i]),
+            "-y"
         ]
+        try:
+            return subprocess.Popen(cmd, stdin=subprocess.PIPE)
+        except OSError as e:
+            # Reported with the chunk's result below
+            start_errors[i] = e
+            return None
+    
+    def finish_encoder(encoder):
+        if encoder is None:
+            return
+        try:
+            encoder.stdin.close()
+        except OSError:
+            # Closing flushes buffered frames into a possibly dead encoder;
+            # its exit code is reported below
+            pass
+    
+    # Encoders are started as their first frame arrives rather than all up
+    # front; the previous one finishes in the background meanwhile
+    encoders = []
+    start_errors = {}
+    total_frames = math.ceil(video.duration * fps)
+    for n, frame in _progress(enumerate(video.iter_frames(dtype="uint8")), total_frames, unit="frame"):
+        i = min(int(n / fps // chunk_duration), num_chunks - 1)
+        while len(encoders) <= i:
+            if encoders:
+                finish_encoder(encoders[-1])
+            encoders.append(start_encoder(len(encoders)))
         
+        if encoders[i] is None:
+            continue
         try:
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            if result.returncode == 0:
-                success_count += 1
-                print(f"Created chunk {i+1}/{num_chunks}: {output_file}")
-            else:
-                print(f"Error creating chunk {i+1}: {result.stderr}")
-        except Exception as e:
-            print(f"Error creating chunk {i+1}: {e}")
+            encoders[i].stdin.write(frame.tobytes())
+        except OSError:
+            # The encoder died; its exit code is reported below
+            pass
+    if encoders:
+        finish_encoder(encoders[-1])
     
-    print(f"\nCompleted! Created {success_count}/{num_chunks} chunks in '{output_dir}'")
-    return success_count == num_chunks
+    success_count = 0
+    for i, encoder in enumerate(encoders):
+        if encoder is None:
+            print(f"Error creating chunk {i+1}: could not start encoder: {start_errors[i]}")
+            continue
+        if encoder.wait() == 0:
+            os.replace(_staging_path(output_files[i]), output_files[i])
+            success_count += 1
+        else:
+            print(f"Error creating chunk {i+1}: encoder exited with code {encoder.returncode}")
+    for i in range(len(encoders), num_chunks):
+        print(f"Error creating chunk {i+1}: no frames fall within it")
+    return success_count
+
+def split_video_moviepy(input_path, output_dir, chunk_duration=60, reencode=False, codec="libx264",
+                        prealloc=False):
+    """Split video using MoviePy (Python-based method).
 
-def split_video_moviepy(input_path, output_dir, chunk_duration=60):
-    """Split video using MoviePy (Python-based method)."""
+    With reencode, every chunk is re-encoded from a single decoding pass
+    instead of being stream copied. codec is the video encoder used
+    whenever chunks are re-encoded ("auto" picks one at that point).
+    With prealloc, stream-copied chunk files are preallocated from the
+    estimated chunk sizes.
+    """
     try:
         # moviepy's VideoFileClip is provided from moviepy.editor
         from moviepy.editor import VideoFileClip
@@ -125,87 +881,93 @@ def split_video_moviepy(input_path, output_dir, chunk_duration=60):
     duration = video.duration
     print(f"Video duration: {duration:.2f} seconds")
     
-    # Calculate number of chunks
-    num_chunks = math.ceil(duration / chunk_duration)
+    # Calculate number of chunks (ceil-div on milliseconds, so float noise
+    # such as 60.0000001s does not add an empty chunk)
+    num_chunks = -(-int(duration * 1000) // (chunk_duration * 1000))
     print(f"Will create {num_chunks} chunks of {chunk_duration} seconds each")
     
     # Create output directory
     os.makedirs(output_dir, exist_ok=True)
     
+    if num_chunks == 0:
+        video.close()
+        print(f"\nCompleted! Created 0/0 chunks in '{output_dir}'")
+        return True
+    
     # Get input file extension
     input_path_obj = Path(input_path)
     extension = input_path_obj.suffix
     
-    # Split the video
+    if reencode:
+        # MoviePy yields a frame at every n/fps before the duration, so a
+        # remainder shorter than one frame leaves the last chunk empty
+        last_frame_time = (math.ceil(duration * video.fps) - 1) / video.fps
+        frame_chunks = int(last_frame_time // chunk_duration) + 1
+        if 0 < frame_chunks < num_chunks:
+            num_chunks = frame_chunks
+            print(f"The last chunk would hold no frames; creating {num_chunks} chunks instead")
+        output_files = [
+            os.path.join(output_dir, f"chunk_{i+1}{extension}") for i in range(num_chunks)
+        ]
+        try:
+            success_count = _reencode_chunks(video, input_path, output_files, chunk_duration, codec)
+        finally:
+            video.close()
+        _remove_staging_dir(output_dir)
+        print(f"\nCompleted! Created {success_count}/{num_chunks} chunks in '{output_dir}'")
+        return success_count == num_chunks
+    
+    # Stream copies read the file directly, so the clip is no longer needed
+    video.close()
+    
+    # Cut on keyframes so every chunk can be stream copied
+    packets = _video_packets(input_path, _moviepy_ffprobe_bin())
+    keyframes = [pts for pts, _, is_keyframe in packets if is_keyframe]
+    bounds = _chunk_bounds(duration, chunk_duration, keyframes)
+    if len(bounds) != num_chunks:
+        num_chunks = len(bounds)
+        print(f"Keyframes are sparse; creating {num_chunks} chunks instead")
+    reserves = _chunk_sizes(packets, bounds) if prealloc else [0] * num_chunks
+    
+    # Split the video, one chunk per worker (the encoders run as subprocesses)
     success_count = 0
-    for i in range(num_chunks):
-        start_time = i * chunk_duration
-        end_time = min((i + 1) * chunk_duration, duration)
-        
-        output_file = os.path.join(output_dir, f"chunk_{i+1}{extension}")
-        
-        print(f"Processing chunk {i+1}: {start_time:.2f}s to {end_time:.2f}s")
+    notes = []
+    max_workers = min(num_chunks, os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = []
+        for i, (start_time, end_time) in enumerate(bounds):
+            output_file = os.path.join(output_dir, f"chunk_{i+1}{extension}")
+            futures.append(executor.submit(
+                _write_chunk_moviepy, i, input_path, start_time, end_time, output_file, codec,
+                reserves[i]
+            ))
         
-        try:
-            # Create subclip
-            subclip = video.subclip(start_time, end_time)
-            
-            # Write the subclip
-            subclip.write_videofile(
-                output_file,
-                codec='libx264',
-                audio_codec='aac',
-                logger=None
-            )
-            
-            # Close the subclip to free memory
-            subclip.close()
-            
-            success_count += 1
-            print(f"Created chunk {i+1}/{num_chunks}: {output_file}")
-            
-        except Exception as e:
-            print(f"Error creating chunk {i+1}: {e}")
-            # Try without audio codec for problematic files
-            try:
-                print(f"Retrying chunk {i+1} without audio codec...")
-                subclip = video.subclip(start_time, end_time)
-                subclip.write_videofile(
-                    output_file,
-                    codec='libx264',
-                    logger=None
-                )
-                subclip.close()
+        for future in _progress(as_completed(futures), num_chunks):
+            i, ok, messages = future.result()
+            if ok:
                 success_count += 1
-                print(f"Created chunk {i+1}/{num_chunks}: {output_file} (retry successful)")
-            except Exception as e2:
-                print(f"Retry also failed for chunk {i+1}: {e2}")
-                # Try one more time with minimal settings
-                try:
-                    print(f"Final retry for chunk {i+1} with basic settings...")
-                    subclip = video.subclip(start_time, end_time)
-                    subclip.write_videofile(output_file, logger=None)
-                    subclip.close()
-                    success_count += 1
-                    print(f"Created chunk {i+1}/{num_chunks}: {output_file} (final retry successful)")
-                except Exception as e3:
-                    print(f"All retries failed for chunk {i+1}: {e3}")
-    
-    # Close the original video
-    video.close()
+            notes.append((i, messages))
     
+    # Report retries and failures once the progress line is finished
+    for i, messages in sorted(notes):
+        for message in messages:
+            print(message)
+    
+    _remove_staging_dir(output_dir)
     print(f"\nCompleted! Created {success_count}/{num_chunks} chunks in '{output_dir}'")
     return success_count == num_chunks
 
+@lru_cache(maxsize=1)
 def check_ffmpeg_availability():
-    """Check if FFmpeg is available."""
+    """Check if FFmpeg is available (cached after the first call)."""
     try:
-        # Check system FFmpeg installation first
-        if os.path.exists("C:\\ffmpeg\\ffmpeg.exe"):
+        # Found in the system installation or on PATH
+        if _ffmpeg_bin() != "ffmpeg":
             return True
         
-        # Check system PATH
-        subprocess.run(["ffmpeg", "-version"], capture_output=True, check=True)
+        # Let the OS try to resolve it
+        subprocess.run([_ffmpeg_bin(), "-version"], stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, check=True)
         return True
     except (subprocess.CalledProcessError, FileNotFoundError):
         return False
@@ -220,56 +982,86 @@ def check_moviepy_availability():
 
 def main():
     parser = argparse.ArgumentParser(description="Split videos into chunks")
-    # Remove this line: parser.add_argument("input_video", help="Path to input video file")
+    parser.add_argument("input_video", nargs="?", default=None,
+                       help="Path to input video file (prompted for when omitted on a terminal)")
     parser.add_argument("--method", choices=["moviepy", "ffmpeg", "auto"], 
                        default="auto", help="Method to use for splitting")
     parser.add_argument("--output-dir", default="output_chunks", 
                        help="Output directory for chunks")
     parser.add_argument("--duration", type=int, default=60, 
                        help="Duration of each chunk in seconds")
+    parser.add_argument("--codec", default="auto",
+                       help="Video encoder for re-encoded chunks (auto prefers a hardware encoder)")
+    parser.add_argument("--batch", metavar="GLOB",
+                       help="Split every file matching this glob pattern (FFmpeg method)")
+    parser.add_argument("--prealloc", action="store_true",
+                       help="Preallocate stream-copied chunk files (Linux, MoviePy method without --reencode)")
+    parser.add_argument("--reencode", action="store_true",
+                       help="Re-encode chunks in a single decoding pass (MoviePy method)")
+    parser.add_argument("--hosts", metavar="HOST1,HOST2",
+                       help="With --reencode, split locally and re-encode the chunks on these SSH hosts")
     
     args = parser.parse_args()
     
-    # Add interactive input for video path
-    input_video = input("Enter the path to the video file: ").strip()
-    
-    # Then use input_video instead of args.input_video throughout the rest of the function
-    # For example, change: if not os.path.exists(args.input_video):
-    # To: if not os.path.exists(input_video):
+    if args.batch:
+        # Batch runs are plain FFmpeg stream copies
+        ignored = [
+            option for option, given in [
+                ("--method moviepy", args.method == "moviepy"),
+                ("--codec", args.codec != "auto"),
+                ("--prealloc", args.prealloc),
+                ("--reencode", args.reencode),
+                ("--hosts", args.hosts),
+            ] if given
+        ]
+        if ignored:
+            print(f"Error: --batch cannot be combined with {', '.join(ignored)}")
+            return 1
+        if not check_ffmpeg_availability():
+            print("Error: FFmpeg not found. --batch requires FFmpeg.")
+            return 1
+        success = split_batch_ffmpeg(args.batch, args.output_dir, args.duration)
+        return 0 if success else 1
     
-    # And update all other references from args.input_video to input_video
+    # Only prompt for the video path when running interactively, so batch
+    # runs (cron, CI, xargs -P) never block on stdin
+    input_video = args.input_video
+    if input_video is None and sys.stdin.isatty():
+        input_video = input("Enter the path to the video file: ").strip()
+    if not input_video:
+        print("Error: No input video given.")
+        return 1
     
     # Check if input file exists
     if not os.path.exists(input_video):
         print(f"Error: Input file '{input_video}' not found.")
         return 1
     
-    # Handle video shorter than chunk duration
-    if args.method == "ffmpeg" or args.method == "auto":
-        duration = get_video_duration_ffmpeg(input_video)
-        if duration and duration <= args.duration:
-            print(f"Video duration ({duration:.2f}s) is shorter than or equal to chunk duration ({args.duration}s).")
-            print("Copying original file to output directory...")
-            
-            os.makedirs(args.output_dir, exist_ok=True)
-            input_path_obj = Path(input_video)
-            output_file = os.path.join(args.output_dir, f"chunk_1{input_path_obj.suffix}")
-            
-            import shutil
-            shutil.copy2(input_video, output_file)
-            print(f"Created: {output_file}")
-            return 0
-    
     # Determine method
     method = args.method
+    hosts = [host.strip() for host in (args.hosts or "").split(",") if host.strip()]
+    if hosts:
+        # Split locally with stream copy, re-encode remotely
+        if not args.reencode or method == "moviepy":
+            print("Error: --hosts requires --reencode and the FFmpeg method")
+            return 1
+        method = "ffmpeg"
+    elif args.reencode:
+        if method == "ffmpeg":
+            print("Error: --reencode is only supported with --method moviepy (or with --hosts)")
+            return 1
+        method = "moviepy"
+    if args.prealloc:
+        if args.reencode or method == "ffmpeg":
+            print("Error: --prealloc only applies to MoviePy stream copies (--method moviepy without --reencode)")
+            return 1
+        method = "moviepy"
+    ffmpeg_available = method in ("ffmpeg", "auto") and check_ffmpeg_availability()
     if method == "auto":
-        ffmpeg_available = check_ffmpeg_availability()
-        moviepy_available = check_moviepy_availability()
-        
         if ffmpeg_available:
             method = "ffmpeg"
             print("Auto-selected FFmpeg method (faster)")
-        elif moviepy_available:
+        elif check_moviepy_availability():
             method = "moviepy"
             print("Auto-selected MoviePy method")
         else:
@@ -281,15 +1073,40 @@ def main():
     # Split the video
     success = False
     if method == "ffmpeg":
-        if not check_ffmpeg_availability():
+        if not ffmpeg_available:
             print("Error: FFmpeg not found. Please install FFmpeg or use --method moviepy")
             return 1
-        success = split_video_ffmpeg(input_video, args.output_dir, args.duration)
+        
+        # Handle video shorter than chunk duration (a plain copy, no re-muxing)
+        duration = None if hosts else get_video_duration_ffmpeg(input_video)
+        if duration and int(duration * 1000) <= args.duration * 1000:
+            print(f"Video duration ({duration:.2f}s) is shorter than or equal to chunk duration ({args.duration}s).")
+            print("Copying original file to output directory...")
+            
+            os.makedirs(args.output_dir, exist_ok=True)
+            input_path_obj = Path(input_video)
+            output_file = os.path.join(args.output_dir, f"chunk_1{input_path_obj.suffix}")
+            
+            # copyfile skips copy2's metadata pass and uses the OS fast path
+            # (sendfile on Linux, CopyFileEx on Windows)
+            shutil.copyfile(input_video, _staging_path(output_file))
+            os.replace(_staging_path(output_file), output_file)
+            _remove_staging_dir(args.output_dir)
+            print(f"Created: {output_file}")
+            return 0
+        
+        chunks = split_video_ffmpeg(input_video, args.output_dir, args.duration, duration=duration)
+        success = bool(chunks)
+        if chunks and hosts:
+            # Remote hosts' hardware is unknown, so auto means libx264 there
+            codec = "libx264" if args.codec == "auto" else args.codec
+            success = _distribute(chunks, hosts, codec) == len(chunks)
     elif method == "moviepy":
         if not check_moviepy_availability():
             print("Error: MoviePy not found. Please install with: pip install moviepy")
             return 1
-        success = split_video_moviepy(input_video, args.output_dir, args.duration)
+        success = split_video_moviepy(input_video, args.output_dir, args.duration,
+                                      args.reencode, args.codec, args.prealloc)
     
     return 0 if success else 1
 